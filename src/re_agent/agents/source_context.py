@@ -67,8 +67,16 @@ class SourceContextBuilder:
             if match is None:
                 continue
             start_line = text.count("\n", 0, match.start()) + 1
-            lines = text.splitlines()
-            snippet = "\n".join(lines[start_line - 1:start_line + 24])
+            # Slice the 25 lines out directly instead of splitting the header.
+            snippet_start = text.rfind("\n", 0, match.start()) + 1
+            snippet_end = snippet_start
+            for _ in range(25):
+                newline = text.find("\n", snippet_end)
+                if newline < 0:
+                    snippet_end = len(text)
+                    break
+                snippet_end = newline + 1
+            snippet = text[snippet_start:snippet_end].removesuffix("\n")
             return f"{path}:{start_line}\n```cpp\n{snippet}\n```"
         return ""
 
@@ -64,6 +64,7 @@ parity:
   # semantic_rules_file: null
   # manual_checks_file: null
   cache_dir: ".cache/re-agent-parity"
+  # index_db: ".cache/re-agent-parity/source-index.db"
 
 orchestrator:
   max_review_rounds: 4
@@ -1,7 +1,10 @@
 """Configuration schema dataclasses for re-agent."""
 from __future__ import annotations
 
+import contextlib
+import re
 from dataclasses import dataclass, field
+from functools import cached_property
 
 
 @dataclass
@@ -34,6 +37,27 @@ class ProjectProfile:
         "Verify struct offsets against project VALIDATE_OFFSET checks",
     ])
 
+    # The compiled forms below are computed on first access and kept on the
+    # instance, so every indexer built from the same profile shares them.
+    # They are not dataclass fields and do not track later edits to the
+    # pattern lists.
+
+    @cached_property
+    def compiled_hook_patterns(self) -> tuple[re.Pattern[str], ...]:
+        """``hook_patterns`` compiled once; invalid expressions are skipped."""
+        compiled: list[re.Pattern[str]] = []
+        for pat in self.hook_patterns:
+            with contextlib.suppress(re.error):
+                compiled.append(re.compile(pat))
+        return tuple(compiled)
+
+    @cached_property
+    def compiled_class_macro(self) -> re.Pattern[str] | None:
+        """Pattern capturing the class name from ``class_macro(Name)``, if set."""
+        if not self.class_macro:
+            return None
+        return re.compile(rf"{re.escape(self.class_macro)}\s*\(\s*(\w+)\s*\)")
+
 
 @dataclass
 class LLMConfig:
@@ -84,6 +108,7 @@ class ParityConfig:
     semantic_rules_file: str | None = None
     manual_checks_file: str | None = None
     cache_dir: str = ".cache/re-agent-parity"
+    index_db: str | None = None
 
 
 @dataclass
@@ -207,6 +207,8 @@ class SourceMatch:
     is_inline_internal_forwarder: bool
     body_start: int = 0
     body_end: int = 0
+    # Distinct names called from the body (call_count counts call sites)
+    callee_names: frozenset[str] = frozenset()
 
 
 @dataclass
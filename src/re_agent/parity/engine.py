@@ -166,7 +166,7 @@ def run_parity(
     profile = config.project_profile
     parity_cfg = config.parity
 
-    indexer = SourceIndexer(source_root, profile)
+    indexer = SourceIndexer(source_root, profile, index_db=parity_cfg.index_db)
 
     manual_checks: dict[str, Any] = {}
     if parity_cfg.manual_checks_file:
@@ -216,4 +216,5 @@ def run_parity(
             "ghidra": ghidra,
         })
 
+    indexer.flush()
     return results
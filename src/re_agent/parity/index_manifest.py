@@ -0,0 +1,94 @@
+"""Persistent SQLite manifest of per-file source index scans."""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from collections.abc import Iterable
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, signature, path)
+)
+"""
+
+
+class IndexManifest:
+    """SQLite file mapping each source file's stamp to its scan results.
+
+    Rows are keyed by scan *kind* (e.g. ``"tokens"``), a *signature* of the
+    patterns the scan depends on, and the file path.  Data is stored as JSON,
+    so a manifest is safe to share between checkouts and CI runs; callers
+    only trust a row while the file's ``(st_mtime_ns, st_size)`` matches.
+
+    The manifest is only a cache: a database that cannot be created, read or
+    written (corrupt, locked, read-only) is logged once and then ignored, so
+    loads return nothing and stores do nothing.
+    """
+
+    def __init__(self, db_path: str | Path) -> None:
+        self.db_path = Path(db_path)
+        self.available = True
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as exc:
+            self._disable(exc)
+
+    def _disable(self, exc: Exception) -> None:
+        logger.warning("Source index manifest %s unusable, continuing without it: %s", self.db_path, exc)
+        self.available = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(_SCHEMA)
+        return conn
+
+    def load(self, kind: str, signature: str = "") -> dict[str, tuple[tuple[int, int], Any]]:
+        """Return ``{path: ((mtime_ns, size), data)}`` for one kind and signature."""
+        if not self.available:
+            return {}
+        try:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    "SELECT path, mtime_ns, size, data FROM entries WHERE kind = ? AND signature = ?",
+                    (kind, signature),
+                ).fetchall()
+            return {path: ((mtime_ns, size), json.loads(data)) for path, mtime_ns, size, data in rows}
+        except (sqlite3.Error, ValueError) as exc:
+            self._disable(exc)
+            return {}
+
+    def store(self, kind: str, rows: Iterable[tuple[str, tuple[int, int], Any]], signature: str = "") -> None:
+        """Insert or replace ``(path, (mtime_ns, size), data)`` rows."""
+        params = [
+            (kind, signature, path, stamp[0], stamp[1], json.dumps(data, separators=(",", ":")))
+            for path, stamp, data in rows
+        ]
+        if not params or not self.available:
+            return
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", params)
+        except sqlite3.Error as exc:
+            self._disable(exc)
+
+    def clear(self) -> None:
+        """Delete every stored row, for all kinds and signatures."""
+        if not self.available:
+            return
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM entries")
+        except sqlite3.Error as exc:
+            self._disable(exc)
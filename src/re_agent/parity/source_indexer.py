@@ -1,21 +1,254 @@
-"""Source code indexer for C++ function body extraction and analysis."""
+"""Source code indexer for C++ function body extraction and analysis.
+
+Lookups treat missing input as "not found" before touching any index:
+:meth:`SourceIndexer.find` returns ``None`` when *fn_name* is empty, and
+:meth:`SourceIndexer.find_by_address` returns ``None`` for an empty or
+unparsable address.  Batch callers may rely on this or drop such entries
+upfront.
+"""
 from __future__ import annotations
 
+import bisect
 import contextlib
+import json
+import os
 import re
+import sys
 from collections import defaultdict
+from collections.abc import Callable, Hashable, Iterable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, TypeVar
 
 from re_agent.config.schema import ProjectProfile
 from re_agent.core.models import SourceMatch
-from re_agent.utils.text import (
-    count_calls,
-    count_control_flow,
-    has_fp_token,
-    strip_comments,
-)
+from re_agent.parity.index_manifest import IndexManifest
+from re_agent.utils.address import normalize_address
+from re_agent.utils.text import scan_body, strip_comments
 
 FUNC_TOKEN_RE = re.compile(r"([A-Za-z_~][A-Za-z0-9_]*)::([A-Za-z_~][A-Za-z0-9_]*)\s*\(")
+_PAREN_RE = re.compile(r"[()]")
+_CALL_NAME_RE = re.compile(r"\b([A-Za-z_][A-Za-z0-9_]*)\s*\(")
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_LEADING_NAME_RE = re.compile(r"[A-Za-z_~][A-Za-z0-9_~]*")
+
+# Structural characters for the matching scanners; everything else is skipped
+# in C by ``re.search`` rather than stepped over one character at a time.
+_BRACE_SCAN_RE = re.compile(r"""[{}"'/]""")
+_PAREN_SCAN_RE = re.compile(r"""[()"'/]""")
+_STRING_END_RE = {'"': re.compile(r'["\\]'), "'": re.compile(r"['\\]")}
+
+
+def _find_matching(
+    text: str,
+    open_idx: int,
+    scan_re: re.Pattern[str],
+    open_ch: str,
+    close_ch: str,
+) -> int | None:
+    """Return the index of the delimiter closing the one at *open_idx*.
+
+    Comments and string/char literals are skipped.  Returns ``None`` when
+    the text ends before the delimiter is balanced.
+    """
+    depth = 0
+    i = open_idx
+    while True:
+        m = scan_re.search(text, i)
+        if m is None:
+            return None
+        i = m.start()
+        ch = text[i]
+        if ch == open_ch:
+            depth += 1
+            i += 1
+        elif ch == close_ch:
+            depth -= 1
+            if depth == 0:
+                return i
+            i += 1
+        elif ch == "/":
+            nxt = text[i + 1:i + 2]
+            if nxt == "/":
+                end = text.find("\n", i + 2)
+                if end < 0:
+                    return None
+                i = end + 1
+            elif nxt == "*":
+                end = text.find("*/", i + 2)
+                if end < 0:
+                    return None
+                i = end + 2
+            else:
+                i += 1
+        else:
+            end_re = _STRING_END_RE[ch]
+            j = i + 1
+            while True:
+                sm = end_re.search(text, j)
+                if sm is None:
+                    return None
+                if text[sm.start()] == ch:
+                    break
+                j = sm.start() + 2
+            i = sm.start() + 1
+
+
+def _iter_source_files(root: Path, extensions: list[str]) -> list[Path]:
+    """Return every file under *root* whose name ends with one of *extensions*.
+
+    Walks the tree once with :func:`os.scandir` (instead of one ``rglob`` per
+    extension) and relies on the cached ``DirEntry`` type information to
+    avoid extra ``stat`` calls.  Symlinked directories are not followed.
+    """
+    suffixes = tuple(extensions)
+    found: list[Path] = []
+    stack = [os.fspath(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(suffixes) and entry.is_file():
+                        found.append(Path(entry.path))
+        except OSError:
+            continue
+    found.sort()
+    return found
+
+
+# Below this many files a thread pool costs more than it saves on a warm
+# page cache.
+_PARALLEL_READ_MIN_FILES = 256
+
+# Part of every ``index_db`` signature; bump it whenever the token/hook scan
+# logic or the row encoding changes so stale manifest rows are ignored.
+_MANIFEST_FORMAT = 1
+
+_Stamp = tuple[int, int]
+_Tokens = tuple[tuple[tuple[str, str], int], ...]
+_Hooks = tuple[tuple[int, tuple[str, str]], ...]
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+# Process-wide per-file scan results, validated against the file's
+# (st_mtime_ns, st_size).  Indexers rebuilt over an unchanged tree reuse these
+# instead of rescanning every file.  Tokens do not depend on the profile;
+# hooks are keyed by (path, scan signature).
+_TOKEN_CACHE: dict[Path, tuple[_Stamp, _Tokens]] = {}
+_HOOK_CACHE: dict[tuple[Path, Hashable], tuple[_Stamp, _Hooks]] = {}
+
+
+def clear_parse_cache() -> None:
+    """Drop all cached per-file parse results."""
+    _TOKEN_CACHE.clear()
+    _HOOK_CACHE.clear()
+
+
+def _cached_scan(
+    cache: dict[_K, tuple[_Stamp, _V]],
+    key: _K,
+    stamp: _Stamp | None,
+    scan: Callable[[], _V],
+    use_cache: bool = True,
+) -> _V:
+    """Return ``scan()``, reusing the cached result while *stamp* is unchanged."""
+    if use_cache and stamp is not None:
+        cached = cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    result = scan()
+    if stamp is not None:
+        cache[key] = (stamp, result)
+    return result
+
+
+def _scan_tokens(txt: str) -> _Tokens:
+    """Return every ``Class::Function(`` token in *txt* with its offset."""
+    # Interned names share one string object per symbol across the
+    # whole tree, which keeps the index small on large codebases.
+    intern = sys.intern
+    return tuple(
+        ((intern(m.group(1)), intern(m.group(2))), m.start())
+        for m in FUNC_TOKEN_RE.finditer(txt)
+    )
+
+
+def _file_stamp(path: Path) -> _Stamp | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _encode_tokens(tokens: _Tokens) -> list[list[Any]]:
+    return [[cls, fn, pos] for (cls, fn), pos in tokens]
+
+
+def _decode_tokens(data: list[list[Any]]) -> _Tokens:
+    intern = sys.intern
+    return tuple(((intern(cls), intern(fn)), pos) for cls, fn, pos in data)
+
+
+def _encode_hooks(hooks: _Hooks) -> list[list[Any]]:
+    return [[addr, cls, fn] for addr, (cls, fn) in hooks]
+
+
+def _decode_hooks(data: list[list[Any]]) -> _Hooks:
+    intern = sys.intern
+    return tuple((addr, (intern(cls), intern(fn))) for addr, cls, fn in data)
+
+
+def _load_file(path: Path) -> tuple[_Stamp | None, str]:
+    """Return the stamp and text of *path*.
+
+    The stamp is taken before reading so a concurrent edit can only make it
+    older than the text, never newer.  The text is read even when the parse
+    cache will be hit so offsets always match what find() later slices.
+    """
+    stamp = _file_stamp(path)
+    return stamp, path.read_text(encoding="utf-8", errors="ignore")
+
+
+def _address_key(address: str) -> int | None:
+    """Parse a hex address string into the integer used as index key."""
+    if not address.strip():
+        return None
+    try:
+        return int(normalize_address(address), 16)
+    except ValueError:
+        return None
+
+
+# Numbered backreferences would point at the wrong group once a pattern is
+# nested inside the combined alternation.
+_NUMBERED_BACKREF_RE = re.compile(r"\\[1-9]")
+
+
+def _combine_hook_scan(
+    hook_patterns: tuple[re.Pattern[str], ...],
+) -> tuple[re.Pattern[str], dict[str, int]] | None:
+    """Fuse the hook patterns into one alternation.
+
+    Each pattern becomes a named alternative (``hook0``, ``hook1``, ...) so a
+    single ``finditer`` pass over a file finds all of them.  Returns the
+    combined pattern and, per alternative name, the index of its first inner
+    capture group.  Returns ``None`` when the patterns cannot be combined
+    safely; callers then scan with each pattern in turn.
+    """
+    parts: list[tuple[str, re.Pattern[str]]] = [
+        (f"hook{i}", hp) for i, hp in enumerate(hook_patterns) if hp.groups >= 2
+    ]
+    if not parts or any(_NUMBERED_BACKREF_RE.search(p.pattern) for _, p in parts):
+        return None
+    try:
+        combined = re.compile("|".join(f"(?P<{name}>{p.pattern})" for name, p in parts))
+    except re.error:
+        return None
+    return combined, {name: combined.groupindex[name] + 1 for name, _ in parts}
 
 
 class SourceIndexer:
@@ -26,176 +259,344 @@ class SourceIndexer:
     2. Project-specific ``hook_patterns`` from the profile, which can
        register additional (function_name, address) associations found
        via hook-install macros like ``RH_ScopedInstall(Func, 0xAddr)``.
+
+    ``index_db`` enables the persistent scan manifest (see :meth:`flush`).
+    ``file_loader`` and ``source_files`` replace disk access, e.g. to index
+    in-memory sources in tests.
     """
 
-    def __init__(self, source_root: Path, profile: ProjectProfile | None = None) -> None:
+    def __init__(
+        self,
+        source_root: Path,
+        profile: ProjectProfile | None = None,
+        *,
+        index_db: str | Path | None = None,
+        file_loader: Callable[[Path], str] | None = None,
+        source_files: Iterable[Path] | None = None,
+    ) -> None:
         self.source_root = source_root
         extensions = profile.source_extensions if profile else [".cpp", ".h", ".hpp"]
         self.stub_markers = tuple(profile.stub_markers) if profile else ("NOTSA_UNREACHABLE",)
         self.stub_call_prefix = profile.stub_call_prefix if profile else "plugin::Call"
-        self._hook_patterns: list[re.Pattern[str]] = []
-        if profile and profile.hook_patterns:
-            for pat in profile.hook_patterns:
-                with contextlib.suppress(re.error):
-                    self._hook_patterns.append(re.compile(pat))
-        self._class_macro_re: re.Pattern[str] | None = None
-        if profile and profile.class_macro:
-            with contextlib.suppress(re.error):
-                self._class_macro_re = re.compile(
-                    rf"{re.escape(profile.class_macro)}\s*\(\s*(\w+)\s*\)"
-                )
+        # Compiled once per profile and shared by every indexer built from it.
+        self._hook_patterns = profile.compiled_hook_patterns if profile else ()
+        self._class_macro = profile.class_macro if profile else ""
+        self._class_macro_re = profile.compiled_class_macro if profile else None
+        self._hook_scan = _combine_hook_scan(self._hook_patterns)
+        self._scan_signature = (
+            tuple(p.pattern for p in self._hook_patterns),
+            self._class_macro_re.pattern if self._class_macro_re else None,
+        )
 
-        self.source_files: list[Path] = sorted(
-            p for ext in extensions for p in source_root.rglob(f"*{ext}")
+        self._extensions = tuple(extensions)
+        # An injected loader serves text from anywhere (e.g. memory in tests),
+        # so its files carry no stamp and bypass the stamp-validated caches.
+        self._file_loader = file_loader
+        self.source_files: list[Path] = (
+            sorted(set(source_files)) if source_files is not None
+            else _iter_source_files(source_root, extensions)
         )
         self.file_text_cache: dict[Path, str] = {}
         self.token_index: dict[tuple[str, str], list[tuple[Path, int]]] = defaultdict(list)
-        # Maps address -> (class_name, fn_name) discovered via hook patterns
-        self.hook_address_index: dict[str, tuple[str, str]] = {}
+        self._file_stamps: dict[Path, _Stamp | None] = {}
+        # Maps file -> its (shared, cached) token scan, so reindex_file only
+        # touches that file's token_index keys
+        self._file_tokens: dict[Path, _Tokens] = {}
+        self._hook_index: dict[int, tuple[str, str]] | None = None
+        # Maps address -> file whose declaration won, and file -> its hook
+        # scan, so reindex_file can retract a file and restore shadowed hooks
+        self._hook_files: dict[int, Path] = {}
+        self._file_hooks: dict[Path, _Hooks] = {}
         self.lookup_cache: dict[tuple[str, str], SourceMatch | None] = {}
         self.free_lookup_cache: dict[str, SourceMatch | None] = {}
+        self._free_call_names: frozenset[str] | None = None
+        # Optional on-disk manifest; rows seed the process-wide scan caches
+        # and flush() writes back whatever changed.
+        self._manifest = IndexManifest(index_db) if index_db else None
+        self._manifest_stamps: dict[tuple[str, str], _Stamp] = {}
+        if self._manifest is not None:
+            self._preload_manifest(self._manifest, "tokens", _TOKEN_CACHE, lambda path: path)
         self._build_index()
 
     def _read_text(self, path: Path) -> str:
         txt = self.file_text_cache.get(path)
         if txt is None:
-            txt = path.read_text(encoding="utf-8", errors="ignore")
+            txt = self._load(path)[1]
             self.file_text_cache[path] = txt
         return txt
 
+    def _load(self, path: Path) -> tuple[_Stamp | None, str]:
+        if self._file_loader is None:
+            return _load_file(path)
+        return None, self._file_loader(path)
+
     def _build_index(self) -> None:
-        for path in self.source_files:
-            txt = self._read_text(path)
-            for m in FUNC_TOKEN_RE.finditer(txt):
-                self.token_index[(m.group(1), m.group(2))].append((path, m.start()))
-            # Scan hook-install macros to map addresses to function names.
-            # Pattern capture groups: group(1) = func_name, group(2) = address.
-            if self._hook_patterns:
-                # Derive class from the file's class macro (e.g. RH_ScopedClass)
-                file_class = ""
-                if self._class_macro_re:
-                    cm = self._class_macro_re.search(txt)
-                    if cm:
-                        file_class = cm.group(1)
-                for hp in self._hook_patterns:
-                    for hm in hp.finditer(txt):
-                        if hm.lastindex and hm.lastindex >= 2:
-                            fn = hm.group(1).strip()
-                            addr = hm.group(2).strip().lower()
-                            if fn and addr:
-                                self.hook_address_index[addr] = (file_class, fn)
+        files = self.source_files
+        workers = min(32, os.cpu_count() or 1)
+        loaded: Iterable[tuple[_Stamp | None, str]]
+        if workers > 1 and len(files) >= _PARALLEL_READ_MIN_FILES:
+            # Reads overlap their I/O waits; the regex scans below hold the
+            # GIL and stay on this thread, in file order.
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                loaded = list(pool.map(self._load, files))
+        else:
+            loaded = map(self._load, files)
+        for path, (stamp, txt) in zip(files, loaded, strict=True):
+            self._file_stamps[path] = stamp
+            self.file_text_cache[path] = txt
+            self._index_tokens(path)
 
-    @staticmethod
-    def _find_matching_brace(text: str, open_brace_idx: int) -> int | None:
-        depth = 0
-        in_str = False
-        str_quote = ""
-        in_sl_comment = False
-        in_ml_comment = False
-        escaped = False
-        i = open_brace_idx
-        n = len(text)
-        while i < n:
-            ch = text[i]
-            nxt = text[i + 1] if i + 1 < n else ""
-            if in_sl_comment:
-                if ch == "\n":
-                    in_sl_comment = False
-                i += 1
-                continue
-            if in_ml_comment:
-                if ch == "*" and nxt == "/":
-                    in_ml_comment = False
-                    i += 2
-                    continue
-                i += 1
+    def _index_tokens(self, path: Path, use_cache: bool = True, ordered: bool = False) -> None:
+        """Add *path*'s definitions to ``token_index``.
+
+        Entries are kept in ``source_files`` order, so the first file defining
+        a name wins.  A full build visits files in that order and can append;
+        *ordered* merges a single file in at its sorted position instead.
+        """
+        tokens = _cached_scan(
+            _TOKEN_CACHE, path, self._file_stamps[path],
+            lambda: _scan_tokens(self._read_text(path)), use_cache,
+        )
+        self._file_tokens[path] = tokens
+        token_index = self.token_index
+        if ordered:
+            for key, pos in tokens:
+                bisect.insort(token_index[key], (path, pos))
+            return
+        for key, pos in tokens:
+            token_index[key].append((path, pos))
+
+    def _index_hooks(self, path: Path, use_cache: bool = True, ordered: bool = False) -> None:
+        """Add *path*'s hook declarations to the hook index.
+
+        As in a full build, the declaration from the last file in
+        ``source_files`` order wins an address.  With *ordered* an address
+        already owned by a later file is left alone.
+        """
+        hook_index = self._hook_index
+        if hook_index is None or not self._hook_patterns:
+            return
+        hooks = _cached_scan(
+            _HOOK_CACHE, (path, self._scan_signature), self._file_stamps[path],
+            lambda: tuple(self._scan_hooks(self._read_text(path))), use_cache,
+        )
+        if not hooks:
+            return
+        self._file_hooks[path] = hooks
+        if ordered:
+            hook_files = self._hook_files
+            for addr, target in hooks:
+                owner = hook_files.get(addr)
+                if owner is None or not owner > path:
+                    hook_index[addr] = target
+                    hook_files[addr] = path
+            return
+        hook_index.update(hooks)
+        self._hook_files.update((addr, path) for addr, _ in hooks)
+
+    def _retract_hooks(self, path: Path) -> None:
+        """Drop *path*'s hooks, handing shared addresses back to other files."""
+        hook_index, hook_files = self._hook_index, self._hook_files
+        stale = {addr for addr, _ in self._file_hooks.pop(path, ()) if hook_files.get(addr) == path}
+        if hook_index is None or not stale:
+            return
+        for addr in stale:
+            del hook_index[addr]
+            del hook_files[addr]
+        # Replay the other files in order so the last declaration wins again
+        for other in self.source_files:
+            for addr, target in self._file_hooks.get(other, ()):
+                if addr in stale:
+                    hook_index[addr] = target
+                    hook_files[addr] = other
+
+    @property
+    def hook_address_index(self) -> dict[int, tuple[str, str]]:
+        """Maps address -> (class_name, fn_name) discovered via hook patterns.
+
+        Addresses are keyed by their integer value, so ``0x6F86A0`` and
+        ``006f86a0`` refer to the same entry.
+
+        Built on first access, so indexers that only look up names never run
+        the hook-pattern scan.
+        """
+        if self._hook_index is None:
+            self._hook_index = {}
+            if self._manifest is not None and self._hook_patterns:
+                self._preload_manifest(
+                    self._manifest, "hooks", _HOOK_CACHE, lambda path: (path, self._scan_signature),
+                )
+            for path in self.source_files:
+                self._index_hooks(path)
+        return self._hook_index
+
+    def _manifest_key(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.source_root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def _manifest_signature(self, kind: str) -> str:
+        if kind == "hooks":
+            return json.dumps([_MANIFEST_FORMAT, *self._scan_signature])
+        return json.dumps([_MANIFEST_FORMAT, FUNC_TOKEN_RE.pattern])
+
+    def _preload_manifest(
+        self,
+        manifest: IndexManifest,
+        kind: str,
+        cache: dict[_K, tuple[_Stamp, Any]],
+        cache_key: Callable[[Path], _K],
+    ) -> None:
+        rows = manifest.load(kind, self._manifest_signature(kind))
+        decode = _decode_tokens if kind == "tokens" else _decode_hooks
+        for path in self.source_files:
+            name = self._manifest_key(path)
+            row = rows.get(name)
+            if row is None:
                 continue
-            if in_str:
-                if escaped:
-                    escaped = False
-                elif ch == "\\":
-                    escaped = True
-                elif ch == str_quote:
-                    in_str = False
-                i += 1
+            stamp = (row[0][0], row[0][1])
+            self._manifest_stamps[(kind, name)] = stamp
+            key = cache_key(path)
+            if key not in cache:
+                cache[key] = (stamp, decode(row[1]))
+
+    def flush(self) -> None:
+        """Write scan results that changed since load to the ``index_db`` manifest.
+
+        Does nothing when the indexer was created without ``index_db``.  Hook
+        rows are only written once the hook index has been built.
+        """
+        if self._manifest is None:
+            return
+        token_rows = self._changed_manifest_rows(
+            "tokens", _TOKEN_CACHE, lambda path: path, _encode_tokens,
+        )
+        self._manifest.store("tokens", token_rows, self._manifest_signature("tokens"))
+        if self._hook_index is not None and self._hook_patterns:
+            hook_rows = self._changed_manifest_rows(
+                "hooks", _HOOK_CACHE, lambda path: (path, self._scan_signature), _encode_hooks,
+            )
+            self._manifest.store("hooks", hook_rows, self._manifest_signature("hooks"))
+
+    def _changed_manifest_rows(
+        self,
+        kind: str,
+        cache: dict[_K, tuple[_Stamp, _V]],
+        cache_key: Callable[[Path], _K],
+        encode: Callable[[_V], Any],
+    ) -> list[tuple[str, _Stamp, Any]]:
+        rows: list[tuple[str, _Stamp, Any]] = []
+        for path in self.source_files:
+            stamp = self._file_stamps.get(path)
+            cached = cache.get(cache_key(path))
+            if stamp is None or cached is None or cached[0] != stamp:
                 continue
-            if ch == "/" and nxt == "/":
-                in_sl_comment = True
-                i += 2
+            name = self._manifest_key(path)
+            if self._manifest_stamps.get((kind, name)) == stamp:
                 continue
-            if ch == "/" and nxt == "*":
-                in_ml_comment = True
-                i += 2
+            rows.append((name, stamp, encode(cached[1])))
+            self._manifest_stamps[(kind, name)] = stamp
+        return rows
+
+    def _scan_hooks(self, txt: str) -> list[tuple[int, tuple[str, str]]]:
+        """Return the ``(address, (class_name, fn_name))`` pairs declared in *txt*.
+
+        Hook pattern capture groups: group(1) = func_name, group(2) = address.
+        The class comes from the file's first class macro (e.g. RH_ScopedClass).
+        """
+        found: list[tuple[str | None, str | None]] = []
+        if self._hook_scan is not None:
+            scan_re, first_groups = self._hook_scan
+            for m in scan_re.finditer(txt):
+                name = m.lastgroup
+                if name is not None:
+                    first = first_groups[name]
+                    found.append((m.group(first), m.group(first + 1)))
+        else:
+            for hp in self._hook_patterns:
+                for hm in hp.finditer(txt):
+                    if hm.lastindex and hm.lastindex >= 2:
+                        found.append((hm.group(1), hm.group(2)))
+        if not found:
+            return []
+        file_class = self._file_class(txt)
+        hook_pairs: list[tuple[int, tuple[str, str]]] = []
+        for fn_raw, addr_raw in found:
+            if fn_raw is None or addr_raw is None:
                 continue
-            if ch in ("'", '"'):
-                in_str = True
-                str_quote = ch
-                i += 1
+            fn = sys.intern(fn_raw.strip())
+            addr = _address_key(addr_raw)
+            if fn and addr is not None:
+                hook_pairs.append((addr, (file_class, fn)))
+        return hook_pairs
+
+    def _file_class(self, txt: str) -> str:
+        """Return the class named by the first class macro in *txt*, or ``""``.
+
+        The macro name is a literal prefix of its pattern, so ``str.find``
+        locates candidates and the regex only confirms them.
+        """
+        macro, macro_re = self._class_macro, self._class_macro_re
+        if not macro or macro_re is None:
+            return ""
+        idx = txt.find(macro)
+        while idx >= 0:
+            m = macro_re.match(txt, idx)
+            if m:
+                return sys.intern(m.group(1))
+            idx = txt.find(macro, idx + 1)
+        return ""
+
+    def reindex_file(self, path: Path) -> None:
+        """Refresh the index entries of a single file after it changed on disk.
+
+        A file that no longer exists (or that an injected ``file_loader``
+        raises ``KeyError`` for) is dropped from the index and a new file
+        matching the profile extensions is added.  All lookup caches are
+        cleared since body offsets may have moved.  The refreshed file's
+        definitions and hooks are merged in ``source_files`` order, so
+        duplicates across files resolve exactly as in a fresh build.
+        """
+        self.file_text_cache.pop(path, None)
+        for key in dict.fromkeys(key for key, _ in self._file_tokens.pop(path, ())):
+            entries = self.token_index.get(key)
+            if entries is None:
                 continue
-            if ch == "{":
-                depth += 1
-            elif ch == "}":
-                depth -= 1
-                if depth == 0:
-                    return i
-            i += 1
-        return None
+            kept = [entry for entry in entries if entry[0] != path]
+            if kept:
+                self.token_index[key] = kept
+            else:
+                del self.token_index[key]
+        self._retract_hooks(path)
+        self.lookup_cache.clear()
+        self.free_lookup_cache.clear()
+        self._free_call_names = None
+
+        loaded: tuple[_Stamp | None, str] | None = None
+        if path.name.endswith(self._extensions):
+            with contextlib.suppress(OSError, KeyError):
+                loaded = self._load(path)
+        if path in self.source_files:
+            if loaded is None:
+                self.source_files.remove(path)
+        elif loaded is not None:
+            bisect.insort(self.source_files, path)
+        if loaded is not None:
+            # Always rescan: an edit can keep both the size and a coarse mtime.
+            self._file_stamps[path], self.file_text_cache[path] = loaded
+            self._index_tokens(path, use_cache=False, ordered=True)
+            self._index_hooks(path, use_cache=False, ordered=True)
+        else:
+            self._file_stamps.pop(path, None)
+
+    @staticmethod
+    def _find_matching_brace(text: str, open_brace_idx: int) -> int | None:
+        return _find_matching(text, open_brace_idx, _BRACE_SCAN_RE, "{", "}")
 
     @staticmethod
     def _find_matching_paren(text: str, open_paren_idx: int) -> int | None:
-        depth = 0
-        in_str = False
-        str_quote = ""
-        in_sl_comment = False
-        in_ml_comment = False
-        escaped = False
-        i = open_paren_idx
-        n = len(text)
-        while i < n:
-            ch = text[i]
-            nxt = text[i + 1] if i + 1 < n else ""
-            if in_sl_comment:
-                if ch == "\n":
-                    in_sl_comment = False
-                i += 1
-                continue
-            if in_ml_comment:
-                if ch == "*" and nxt == "/":
-                    in_ml_comment = False
-                    i += 2
-                    continue
-                i += 1
-                continue
-            if in_str:
-                if escaped:
-                    escaped = False
-                elif ch == "\\":
-                    escaped = True
-                elif ch == str_quote:
-                    in_str = False
-                i += 1
-                continue
-            if ch == "/" and nxt == "/":
-                in_sl_comment = True
-                i += 2
-                continue
-            if ch == "/" and nxt == "*":
-                in_ml_comment = True
-                i += 2
-                continue
-            if ch in ("'", '"'):
-                in_str = True
-                str_quote = ch
-                i += 1
-                continue
-            if ch == "(":
-                depth += 1
-            elif ch == ")":
-                depth -= 1
-                if depth == 0:
-                    return i
-            i += 1
-        return None
+        return _find_matching(text, open_paren_idx, _PAREN_SCAN_RE, "(", ")")
 
     @staticmethod
     def _is_inline_internal_forwarder(body_no_comments: str) -> bool:
@@ -216,16 +617,17 @@ class SourceIndexer:
         if open_idx <= 0:
             return False
         callee = inner[:open_idx].strip()
-        depth = 0
-        for ch in inner[open_idx:]:
-            if ch == "(":
-                depth += 1
-            elif ch == ")":
-                depth -= 1
+        opens = inner.count("(", open_idx)
+        if opens != inner.count(")", open_idx):
+            return False
+        if opens > 1:
+            # Balanced totals can still close a paren before it is opened
+            # (``f()) + (g()``); only nested calls need the ordered walk.
+            depth = 0
+            for m in _PAREN_RE.finditer(inner, open_idx):
+                depth += 1 if m.group() == "(" else -1
                 if depth < 0:
                     return False
-        if depth != 0:
-            return False
         callee_base = callee
         if callee_base.startswith("this->"):
             callee_base = callee_base[len("this->"):]
@@ -255,27 +657,28 @@ class SourceIndexer:
         """Analyze a candidate body with the same rules as indexed source."""
         body_nc = strip_comments(body)
         body_lines = body.count("\n") + 1
-        total, plugin, non_plugin = count_calls(body_nc, self.stub_call_prefix)
+        scan = scan_body(body_nc, self.stub_call_prefix, self.stub_markers)
         return SourceMatch(
             path=path,
             line=line,
             body=body,
             body_no_comments=body_nc,
             body_lines=body_lines,
-            call_count=total,
-            plugin_call_count=plugin,
-            non_plugin_call_count=non_plugin,
-            control_flow_count=count_control_flow(body_nc),
-            has_stub_marker=any(marker in body_nc for marker in self.stub_markers),
-            has_fp_token=has_fp_token(body_nc),
+            call_count=scan.call_count,
+            plugin_call_count=scan.plugin_call_count,
+            non_plugin_call_count=scan.non_plugin_call_count,
+            control_flow_count=scan.control_flow_count,
+            has_stub_marker=scan.has_stub_marker,
+            has_fp_token=scan.has_fp_token,
             is_inline_internal_forwarder=self._is_inline_internal_forwarder(body_nc),
             body_start=body_start,
             body_end=body_end,
+            callee_names=scan.callee_names,
         )
 
     def _candidate_keys(self, class_name: str, fn_name: str) -> list[tuple[str, str]]:
         keys: list[tuple[str, str]] = [(class_name, fn_name)]
-        m = re.match(r"[A-Za-z_~][A-Za-z0-9_~]*", fn_name)
+        m = _LEADING_NAME_RE.match(fn_name)
         if m and m.group(0) != fn_name:
             keys.append((class_name, m.group(0)))
         if fn_name == "Constructor" or fn_name.startswith("Constructor"):
@@ -390,14 +793,20 @@ class SourceIndexer:
             return None
         return self._find_function_body_open(txt, fn_idx, fn_name)
 
-    def find_by_address(self, address: str) -> SourceMatch | None:
+    def find_by_address(self, address: str | int) -> SourceMatch | None:
         """Look up a source function body by its hook address.
 
         Uses the ``hook_address_index`` built from hook-install macros to
         resolve *address* → *(class_name, fn_name)* and then delegates to
-        :meth:`find`.  Returns ``None`` if the address is not in the index.
+        :meth:`find`.  *address* may be an int or a hex string in any of the
+        forms accepted by :func:`normalize_address`.  Returns ``None`` if the
+        address is not in the index or cannot be parsed.
         """
-        addr_key = address.strip().lower()
+        if not address:
+            return None
+        addr_key = address if isinstance(address, int) else _address_key(address)
+        if addr_key is None:
+            return None
         entry = self.hook_address_index.get(addr_key)
         if entry is None:
             return None
@@ -406,11 +815,29 @@ class SourceIndexer:
             return None
         return self.find(cls, fn)
 
+    @property
+    def free_call_names(self) -> frozenset[str]:
+        """Every identifier in the tree that is directly followed by ``(``.
+
+        Built lazily on the first free-function lookup.  A plain identifier
+        absent from this set cannot have a free-function definition, which
+        lets :meth:`find` reject unknown names without rescanning every file.
+        """
+        if self._free_call_names is None:
+            names: set[str] = set()
+            for path in self.source_files:
+                names.update(_CALL_NAME_RE.findall(self._read_text(path)))
+            self._free_call_names = frozenset(sys.intern(n) for n in names)
+        return self._free_call_names
+
     def _find_free_function(self, fn_name: str) -> SourceMatch | None:
         if not fn_name:
             return None
         if fn_name in self.free_lookup_cache:
             return self.free_lookup_cache[fn_name]
+        if _IDENTIFIER_RE.fullmatch(fn_name) and fn_name not in self.free_call_names:
+            self.free_lookup_cache[fn_name] = None
+            return None
         pattern = re.compile(rf"(?<!::)\b{re.escape(fn_name)}\s*\(")
         for path in self.source_files:
             txt = self._read_text(path)
@@ -429,14 +856,11 @@ class SourceIndexer:
         return None
 
     def find(self, class_name: str, fn_name: str) -> SourceMatch | None:
-        if not fn_name and not class_name:
+        if not fn_name:
             return None
         key = (class_name, fn_name)
         if key in self.lookup_cache:
             return self.lookup_cache[key]
-        if not fn_name:
-            self.lookup_cache[key] = None
-            return None
         for candidate_key in self._candidate_keys(class_name, fn_name):
             candidates = self.token_index.get(candidate_key, [])
             for path, idx in candidates:
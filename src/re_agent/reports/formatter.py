@@ -6,6 +6,13 @@ from typing import Any
 
 from re_agent.core.models import ReversalResult
 
+try:
+    import orjson
+
+    _HAS_ORJSON = True
+except ImportError:  # pragma: no cover - optional speed-up
+    _HAS_ORJSON = False
+
 
 def format_result(result: ReversalResult, include_code: bool = True) -> str:
     """Format a single result for terminal display."""
@@ -51,24 +58,45 @@ def format_result(result: ReversalResult, include_code: bool = True) -> str:
 
 def results_to_json(results: list[ReversalResult]) -> str:
     """Serialize results list to JSON string."""
-    data = [_result_to_dict(r) for r in results]
-    return json.dumps({"results": data}, indent=2)
+    return _json_from_dicts([_result_to_dict(r) for r in results])
 
 
 def results_to_markdown(results: list[ReversalResult]) -> str:
     """Format results as a markdown table."""
+    return _markdown_from_dicts([_result_to_dict(r) for r in results])
+
+
+def results_to_json_and_markdown(results: list[ReversalResult]) -> tuple[str, str]:
+    """Render results as both JSON and markdown from a single traversal."""
+    data = [_result_to_dict(r) for r in results]
+    return _json_from_dicts(data), _markdown_from_dicts(data)
+
+
+def _json_from_dicts(data: list[dict[str, Any]]) -> str:
+    return _dumps_indented({"results": data})
+
+
+def _markdown_from_dicts(data: list[dict[str, Any]]) -> str:
     lines = [
         "| Address | Function | Status | Rounds | Parity |",
         "|---------|----------|--------|--------|--------|",
     ]
-    for r in results:
-        status = "PASS" if r.success else "FAIL"
-        parity = r.parity_status.value if r.parity_status else "-"
-        fn = f"{r.target.class_name}::{r.target.function_name}"
-        lines.append(f"| {r.target.address} | {fn} | {status} | {r.rounds_used} | {parity} |")
+    for d in data:
+        status = "PASS" if d["success"] else "FAIL"
+        parity = d.get("parity_status", "-")
+        fn = f"{d['class_name']}::{d['function_name']}"
+        lines.append(f"| {d['address']} | {fn} | {status} | {d['rounds_used']} | {parity} |")
     return "\n".join(lines)
 
 
+def _dumps_indented(data: dict[str, Any]) -> str:
+    """Encode *data* as 2-space indented JSON, using ``orjson`` when installed."""
+    if _HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
+    # orjson always writes raw UTF-8; match it so output is backend-independent
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
 def _result_to_dict(result: ReversalResult) -> dict[str, Any]:
     d: dict[str, Any] = {
         "address": result.target.address,
@@ -1,6 +1,8 @@
 """Subprocess execution utilities."""
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import subprocess
 from collections.abc import Sequence
 
@@ -55,3 +57,59 @@ def run_cmd_split(
         return -1, "", f"TIMEOUT after {timeout_s}s: {e}"
     except FileNotFoundError:
         return -1, "", f"Command not found: {args[0]}"
+
+
+async def run_cmd_async(args: Sequence[str], timeout_s: int = 45) -> tuple[bool, str]:
+    """Asynchronous counterpart of :func:`run_cmd`.
+
+    Spawns the process with :func:`asyncio.create_subprocess_exec` so several
+    invocations can overlap instead of serialising on process start-up and
+    I/O.  The return value and error messages match :func:`run_cmd`,
+    including its universal-newline translation of ``\r\n`` and ``\r``.
+    """
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+    except FileNotFoundError:
+        return False, f"Command not found: {args[0]}"
+    try:
+        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout_s)
+    except asyncio.TimeoutError:
+        with contextlib.suppress(ProcessLookupError):
+            proc.kill()
+        await proc.wait()
+        e = subprocess.TimeoutExpired(list(args), timeout_s)
+        return False, f"TIMEOUT after {timeout_s}s: {' '.join(str(a) for a in args)}\n{e}"
+    output = stdout.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+    return proc.returncode == 0, output
+
+
+def run_cmd_batch(
+    arg_lists: Sequence[Sequence[str]],
+    timeout_s: int = 45,
+    concurrency: int = 8,
+) -> list[tuple[bool, str]]:
+    """Run several commands concurrently and return their results in order.
+
+    At most *concurrency* processes run at the same time.  Each entry of the
+    returned list is the ``(success, combined_output)`` tuple that
+    :func:`run_cmd` would have produced for the corresponding command.
+
+    Must be called from synchronous code (it drives its own event loop).
+    """
+
+    async def _run_all() -> list[tuple[bool, str]]:
+        sem = asyncio.Semaphore(max(1, concurrency))
+
+        async def _run_one(args: Sequence[str]) -> tuple[bool, str]:
+            async with sem:
+                return await run_cmd_async(args, timeout_s)
+
+        return list(await asyncio.gather(*(_run_one(a) for a in arg_lists)))
+
+    if not arg_lists:
+        return []
+    return asyncio.run(_run_all())
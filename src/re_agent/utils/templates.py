@@ -4,12 +4,16 @@ from __future__ import annotations
 import string
 from pathlib import Path
 
+# Parsed templates keyed by path, invalidated when the file's mtime or size changes.
+_template_cache: dict[Path, tuple[tuple[int, int], string.Template]] = {}
+
 
 def render_template(template_path: Path, **variables: str) -> str:
     """Read a template file and substitute ``$variable`` placeholders.
 
     Uses :class:`string.Template.safe_substitute` so that unresolved
-    placeholders are left as-is rather than raising an error.
+    placeholders are left as-is rather than raising an error.  The parsed
+    template is cached per path and reloaded when the file changes on disk.
 
     Args:
         template_path: Path to the template file.
@@ -18,9 +22,14 @@ def render_template(template_path: Path, **variables: str) -> str:
     Returns:
         The rendered template string.
     """
-    text = template_path.read_text(encoding="utf-8")
-    tmpl = string.Template(text)
-    return tmpl.safe_substitute(variables)
+    st = template_path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    entry = _template_cache.get(template_path)
+    if entry is None or entry[0] != stamp:
+        text = template_path.read_text(encoding="utf-8")
+        entry = (stamp, string.Template(text))
+        _template_cache[template_path] = entry
+    return entry[1].safe_substitute(variables)
 
 
 def render_template_string(template_text: str, **variables: str) -> str:
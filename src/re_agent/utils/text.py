@@ -1,23 +1,59 @@
 """Text analysis utilities for C++ source and assembly."""
 from __future__ import annotations
 
+import functools
 import re
+from collections.abc import Callable
+from typing import Any, NamedTuple, Protocol, cast
+
+try:
+    import re2
+
+    _HAS_RE2 = True
+except ImportError:  # pragma: no cover - optional speed-up
+    _HAS_RE2 = False
+
+
+class _SearchPattern(Protocol):
+    def search(self, string: str) -> object | None: ...
+
+
+def _compile_search(pattern: str) -> _SearchPattern:
+    """Compile a pattern that is only ever used with ``search``.
+
+    Uses google-re2 when installed: its linear-time DFA is several times
+    faster than ``re`` for whole-text scans that usually find nothing.  It
+    is not used for ``sub``/``finditer`` patterns, where the binding's
+    per-match overhead makes it slower than ``re``.
+    """
+    if _HAS_RE2:
+        return cast(_SearchPattern, re2.compile(pattern))
+    return re.compile(pattern)
 
 # ---------------------------------------------------------------------------
 # Compiled regex patterns
 # ---------------------------------------------------------------------------
 
-COMMENT_BLOCK_RE: re.Pattern[str] = re.compile(r"/\*.*?\*/", re.S)
+# Unrolled ``/\*.*?\*/``: linear, no per-character lazy backtracking.
+COMMENT_BLOCK_RE: re.Pattern[str] = re.compile(r"/\*[^*]*\*+(?:[^/*][^*]*\*+)*/")
 COMMENT_LINE_RE: re.Pattern[str] = re.compile(r"//.*")
+# Either comment form, matched left to right in a single pass.
+COMMENTS_RE: re.Pattern[str] = re.compile(r"/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|//[^\n]*")
 TOKEN_CALL_RE: re.Pattern[str] = re.compile(r"\b([A-Za-z_][A-Za-z0-9_:]*)\s*\(")
 CONTROL_FLOW_RE: re.Pattern[str] = re.compile(r"\b(if|for|while|switch|do|goto)\b")
 ASM_LINE_RE: re.Pattern[str] = re.compile(r"^[0-9a-fA-F]{8}\s+([A-Z]+)")
+# TOKEN_CALL_RE and CONTROL_FLOW_RE fused so a body is scanned once.  A call
+# match can itself contain control-flow words (``if(`` or ``label:if(``); those
+# are counted from the token's ``:``-separated segments.
+BODY_SCAN_RE: re.Pattern[str] = re.compile(
+    r"\b(?P<call>[A-Za-z_][A-Za-z0-9_:]*)\s*\(|\b(?P<ctl>if|for|while|switch|do|goto)\b"
+)
 
 # ---------------------------------------------------------------------------
 # Token sets
 # ---------------------------------------------------------------------------
 
-CPP_KEYWORDS: set[str] = {
+CPP_KEYWORDS: frozenset[str] = frozenset({
     "if",
     "for",
     "while",
@@ -33,7 +69,19 @@ CPP_KEYWORDS: set[str] = {
     "catch",
     "new",
     "delete",
-}
+})
+
+CONTROL_FLOW_KEYWORDS: frozenset[str] = frozenset({
+    "if",
+    "for",
+    "while",
+    "switch",
+    "do",
+    "goto",
+})
+
+# Unqualified call-shaped tokens that are not counted as calls.
+_NON_CALL_TOKENS: frozenset[str] = CPP_KEYWORDS | {"operator"}
 
 FP_SOURCE_TOKENS: tuple[str, ...] = (
     "std::sin",
@@ -59,6 +107,9 @@ FP_SOURCE_TOKENS: tuple[str, ...] = (
     "fabs(",
 )
 
+# All FP source tokens folded into one alternation so text is scanned once.
+_FP_TOKEN_RE = _compile_search("|".join(map(re.escape, FP_SOURCE_TOKENS)))
+
 FP_ASM_PREFIXES: tuple[str, ...] = (
     "FCOM",
     "FUCOM",
@@ -76,54 +127,245 @@ FP_ASM_PREFIXES: tuple[str, ...] = (
     "FNSTSW",
 )
 
+# ASM_LINE_RE applied to a whole listing at once, with the opcode required to
+# start with one of FP_ASM_PREFIXES.  Listings without FP code are rejected in a
+# single C-level search; there is no per-line list or Python loop.
+_ASM_FP_OP_RE = _compile_search(
+    r"(?m)^[0-9a-fA-F]{8}[ \t]+(?:" + "|".join(map(re.escape, FP_ASM_PREFIXES)) + ")"
+)
+
+# Bound methods for the per-call helpers below, saving an attribute lookup on
+# every call.
+_COMMENTS_SUB = COMMENTS_RE.sub
+_ASM_LINE_MATCH = ASM_LINE_RE.match
+_FP_TOKEN_SEARCH = _FP_TOKEN_RE.search
+_ASM_FP_OP_SEARCH = _ASM_FP_OP_RE.search
+
 
 # ---------------------------------------------------------------------------
 # Functions
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=2048)
 def strip_comments(text: str) -> str:
-    """Remove both block (``/* ... */``) and line (``// ...``) comments from C++ source."""
-    return COMMENT_LINE_RE.sub("", COMMENT_BLOCK_RE.sub("", text))
+    """Remove both block (``/* ... */``) and line (``// ...``) comments from C++ source.
+
+    Results are memoized: review rounds and parity re-runs strip the same
+    bodies repeatedly.  Call ``strip_comments.cache_clear()`` to drop them.
+    """
+    if "/" not in text:
+        # No comment can start without a slash; return the input uncopied.
+        return text
+    return _COMMENTS_SUB("", text)
+
+
+class _BodyScanTables(NamedTuple):
+    """Pattern and token tables for one string type (``str`` or ``bytes``)."""
+
+    scan_re: re.Pattern[Any]
+    control_flow_re: re.Pattern[Any]
+    colon: Any
+    operator_suffix: Any
+    control_flow: frozenset[Any]
+    non_call: frozenset[Any]
+
+
+_STR_TABLES = _BodyScanTables(
+    scan_re=BODY_SCAN_RE,
+    control_flow_re=CONTROL_FLOW_RE,
+    colon=":",
+    operator_suffix="::operator",
+    control_flow=CONTROL_FLOW_KEYWORDS,
+    non_call=_NON_CALL_TOKENS,
+)
+# ``bytes`` twins so ASCII source read in binary mode can be scanned without
+# decoding first.
+_BYTES_TABLES = _BodyScanTables(
+    scan_re=re.compile(BODY_SCAN_RE.pattern.encode("ascii")),
+    control_flow_re=re.compile(CONTROL_FLOW_RE.pattern.encode("ascii")),
+    colon=b":",
+    operator_suffix=b"::operator",
+    control_flow=frozenset(k.encode("ascii") for k in CONTROL_FLOW_KEYWORDS),
+    non_call=frozenset(k.encode("ascii") for k in _NON_CALL_TOKENS),
+)
+
+
+@functools.cache
+def make_call_counter(
+    stub_call_prefix: str | bytes = "plugin::Call",
+) -> Callable[[Any], tuple[int, int, int, int, frozenset[Any]]]:
+    """Return a call/control-flow counter specialised for *stub_call_prefix*.
+
+    The prefix, its length and the pattern/keyword tables are bound once as
+    closure constants, so the returned function only takes the body.  The
+    counter accepts ``str`` bodies for a ``str`` prefix and ``bytes`` bodies
+    for a ``bytes`` prefix.  Factories are cached per prefix, so calling this
+    whenever a project profile is loaded is cheap.
+
+    The counter returns ``(total_calls, plugin_calls, non_plugin_calls,
+    control_flow, callee_names)``; ``callee_names`` holds the distinct call
+    tokens that were counted, qualified as written.
+    """
+    tables = _BYTES_TABLES if isinstance(stub_call_prefix, bytes) else _STR_TABLES
+    finditer = tables.scan_re.finditer
+    colon = tables.colon
+    operator_suffix = tables.operator_suffix
+    control_keywords = tables.control_flow
+    non_call = tables.non_call
+    prefix = stub_call_prefix
+    prefix_len = len(prefix)
+    prefix_first = prefix[0] if prefix else None
+
+    def count(body_no_comments: Any) -> tuple[int, int, int, int, frozenset[Any]]:
+        plugin = 0
+        non_plugin = 0
+        control_flow = 0
+        names: set[Any] = set()
+        add_name = names.add
+        for m in finditer(body_no_comments):
+            tok = m.group("call")
+            if tok is None:
+                control_flow += 1
+                continue
+            # Dispatch on token shape: keywords never contain ``:``, and
+            # qualified names only need the ``::operator`` filter.
+            if colon in tok:
+                parts = tok.split(colon)
+                if not control_keywords.isdisjoint(parts):
+                    control_flow += sum(1 for part in parts if part in control_keywords)
+                if tok.endswith(operator_suffix):
+                    continue
+            else:
+                if tok in control_keywords:
+                    control_flow += 1
+                if tok in non_call:
+                    continue
+            add_name(tok)
+            # Most tokens differ from the prefix at the first character; check
+            # that before slicing.  Slice compare avoids a method lookup.
+            if (prefix_first is None or tok[0] == prefix_first) and tok[:prefix_len] == prefix:
+                plugin += 1
+            else:
+                non_plugin += 1
+        return plugin + non_plugin, plugin, non_plugin, control_flow, frozenset(names)
+
+    return count
+
+
+@functools.lru_cache(maxsize=4096)
+def count_calls_and_control_flow(
+    body_no_comments: str | bytes,
+    stub_call_prefix: str | bytes = "plugin::Call",
+) -> tuple[int, int, int, int]:
+    """Count calls and control-flow keywords in one scan of comment-stripped C++.
+
+    Args:
+        body_no_comments: Source text with comments already removed, as
+            ``str`` or as ASCII-compatible ``bytes``.
+        stub_call_prefix: Prefix used to identify stub/plugin calls.
+
+    Returns:
+        A tuple of ``(total_calls, plugin_calls, non_plugin_calls, control_flow)``
+        matching :func:`count_calls` and :func:`count_control_flow`.  Results
+        are memoized per ``(body, prefix)`` like :func:`strip_comments`.
+    """
+    if isinstance(body_no_comments, bytes):
+        if isinstance(stub_call_prefix, str):
+            stub_call_prefix = stub_call_prefix.encode("utf-8")
+    elif isinstance(stub_call_prefix, bytes):
+        stub_call_prefix = stub_call_prefix.decode("utf-8")
+    return make_call_counter(stub_call_prefix)(body_no_comments)[:4]
 
 
 def count_calls(
-    body_no_comments: str,
-    stub_call_prefix: str = "plugin::Call",
+    body_no_comments: str | bytes,
+    stub_call_prefix: str | bytes = "plugin::Call",
 ) -> tuple[int, int, int]:
     """Count function calls in comment-stripped C++ source.
 
     Args:
-        body_no_comments: Source text with comments already removed.
+        body_no_comments: Source text with comments already removed, as
+            ``str`` or as ASCII-compatible ``bytes``.
         stub_call_prefix: Prefix used to identify stub/plugin calls.
 
     Returns:
         A tuple of ``(total_calls, plugin_calls, non_plugin_calls)``.
     """
-    total = 0
-    plugin = 0
-    non_plugin = 0
-    for m in TOKEN_CALL_RE.finditer(body_no_comments):
-        tok = m.group(1)
-        if tok in CPP_KEYWORDS:
-            continue
-        if tok.endswith("::operator") or tok == "operator":
-            continue
-        total += 1
-        if tok.startswith(stub_call_prefix):
-            plugin += 1
-        else:
-            non_plugin += 1
+    total, plugin, non_plugin, _ = count_calls_and_control_flow(body_no_comments, stub_call_prefix)
     return total, plugin, non_plugin
 
 
-def count_control_flow(body_no_comments: str) -> int:
-    """Count control-flow keywords in comment-stripped C++ source."""
-    return len(CONTROL_FLOW_RE.findall(body_no_comments))
+def count_control_flow(body_no_comments: str | bytes) -> int:
+    """Count control-flow keywords in comment-stripped C++ source (``str`` or ``bytes``)."""
+    tables = _BYTES_TABLES if isinstance(body_no_comments, bytes) else _STR_TABLES
+    return len(tables.control_flow_re.findall(body_no_comments))
 
 
 def has_fp_token(text: str) -> bool:
     """Check whether the text contains any floating-point math tokens."""
-    return any(tok in text for tok in FP_SOURCE_TOKENS)
+    return _FP_TOKEN_SEARCH(text) is not None
+
+
+@functools.cache
+def compile_markers(markers: tuple[str, ...]) -> re.Pattern[str] | None:
+    """Return one alternation matching any of the literal *markers*.
+
+    Empty markers are ignored; returns ``None`` when nothing is left.  Cached
+    per tuple, so every caller with the same markers shares one pattern.
+    """
+    literals = [m for m in markers if m]
+    if not literals:
+        return None
+    return re.compile("|".join(map(re.escape, literals)))
+
+
+class BodyScan(NamedTuple):
+    """Every per-body signal the parity pipeline needs, from :func:`scan_body`."""
+
+    call_count: int
+    plugin_call_count: int
+    non_plugin_call_count: int
+    control_flow_count: int
+    has_fp_token: bool
+    has_stub_marker: bool
+    callee_names: frozenset[str]
+
+
+@functools.lru_cache(maxsize=4096)
+def scan_body(
+    body_no_comments: str,
+    stub_call_prefix: str = "plugin::Call",
+    stub_markers: tuple[str, ...] = (),
+) -> BodyScan:
+    """Collect call, control-flow, FP-token, stub-marker and callee signals for one body.
+
+    Calls and control flow come from a single fused scan; the FP-token check
+    is one alternation search.  Memoized per argument tuple so repeated
+    analyses of the same body cost one cache probe.  The counter is called
+    directly rather than through :func:`count_calls_and_control_flow`, so
+    each body is held by this cache only.
+    """
+    total, plugin, non_plugin, control_flow, callee_names = make_call_counter(stub_call_prefix)(body_no_comments)
+    return BodyScan(
+        call_count=total,
+        plugin_call_count=plugin,
+        non_plugin_call_count=non_plugin,
+        control_flow_count=control_flow,
+        has_fp_token=has_fp_token(body_no_comments),
+        has_stub_marker=has_marker(body_no_comments, stub_markers),
+        callee_names=callee_names,
+    )
+
+
+def has_marker(text: str, markers: tuple[str, ...]) -> bool:
+    """Check whether *text* contains any of the literal *markers* in one pass.
+
+    A single marker is a plain substring test; several share one alternation.
+    """
+    if len(markers) == 1:
+        return bool(markers[0]) and markers[0] in text
+    marker_re = compile_markers(markers)
+    return marker_re is not None and marker_re.search(text) is not None
 
 
 def parse_asm_line_op(line: str) -> str | None:
@@ -135,7 +377,7 @@ def parse_asm_line_op(line: str) -> str | None:
     Returns:
         The opcode string if matched, otherwise ``None``.
     """
-    m = ASM_LINE_RE.match(line)
+    m = _ASM_LINE_MATCH(line)
     if m:
         return m.group(1)
     return None
@@ -143,8 +385,4 @@ def parse_asm_line_op(line: str) -> str | None:
 
 def has_fp_asm(instructions: str) -> bool:
     """Check whether assembly instructions contain floating-point sensitive opcodes."""
-    for line in instructions.splitlines():
-        op = parse_asm_line_op(line)
-        if op is not None and op.startswith(FP_ASM_PREFIXES):
-            return True
-    return False
+    return _ASM_FP_OP_SEARCH(instructions) is not None
@@ -5,7 +5,7 @@ import json
 
 from re_agent.backend.protocol import REBackend
 from re_agent.core.models import FunctionTarget, ObjectiveVerdict, Verdict
-from re_agent.utils.text import count_calls, count_control_flow, strip_comments
+from re_agent.utils.text import count_calls_and_control_flow, count_control_flow, strip_comments
 
 
 def verify_candidate(
@@ -24,8 +24,7 @@ def verify_candidate(
         )
 
     source_body = strip_comments(_extract_body(code))
-    source_call_count, _, _ = count_calls(source_body)
-    source_flow_count = count_control_flow(source_body)
+    source_call_count, _, _, source_flow_count = count_calls_and_control_flow(source_body)
 
     findings: list[str] = []
     checks_run = 0
@@ -0,0 +1,24 @@
+"""Tests for the compiled pattern helpers on ProjectProfile."""
+from __future__ import annotations
+
+from re_agent.config.schema import ProjectProfile
+
+
+def test_compiled_hook_patterns_skip_invalid_and_are_cached() -> None:
+    profile = ProjectProfile(hook_patterns=[r"Install\((\w+), (0x[0-9a-f]+)\)", r"broken("])
+    compiled = profile.compiled_hook_patterns
+    assert len(compiled) == 1
+    assert compiled[0].search("Install(Foo, 0x10)") is not None
+    assert profile.compiled_hook_patterns is compiled
+
+
+def test_compiled_class_macro() -> None:
+    profile = ProjectProfile(class_macro="RH_ScopedClass")
+    assert profile.compiled_class_macro is not None
+    m = profile.compiled_class_macro.search("RH_ScopedClass( CTrain )")
+    assert m is not None and m.group(1) == "CTrain"
+
+
+def test_compiled_patterns_absent_when_unset() -> None:
+    profile = ProjectProfile(class_macro="")
+    assert profile.compiled_class_macro is None
@@ -0,0 +1,70 @@
+"""Shared fixtures for parity tests."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+from re_agent.parity import source_indexer
+from re_agent.parity.source_indexer import SourceIndexer
+
+_VIRTUAL_ROOT = Path("/virtual-source")
+
+
+@pytest.fixture(scope="module")
+def memory_files() -> dict[Path, str]:
+    """In-memory source tree served to the shared indexer."""
+    return {}
+
+
+@pytest.fixture(scope="module")
+def shared_indexer(memory_files: dict[Path, str]) -> SourceIndexer:
+    """One default-profile indexer per module, updated file by file."""
+    return SourceIndexer(_VIRTUAL_ROOT, file_loader=memory_files.__getitem__, source_files=[])
+
+
+@pytest.fixture
+def write_source(
+    memory_files: dict[Path, str], shared_indexer: SourceIndexer,
+) -> Iterator[Callable[[str, str], SourceIndexer]]:
+    """Add a file to the shared in-memory tree and reindex just that file.
+
+    Files written by a test are removed (and unindexed) again afterwards.
+    """
+    written: list[Path] = []
+
+    def _write(name: str, text: str) -> SourceIndexer:
+        path = _VIRTUAL_ROOT / name
+        memory_files[path] = text
+        shared_indexer.reindex_file(path)
+        written.append(path)
+        return shared_indexer
+
+    yield _write
+    for path in written:
+        memory_files.pop(path, None)
+        shared_indexer.reindex_file(path)
+
+
+@pytest.fixture
+def scan_counter(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, str]]:
+    """Record every real token/hook scan as ``("tokens" | "hooks", text)``.
+
+    Cache hits do not scan, so an empty list means everything was reused.
+    """
+    scans: list[tuple[str, str]] = []
+    real_tokens = source_indexer._scan_tokens
+    real_hooks = SourceIndexer._scan_hooks
+
+    def counting_tokens(txt: str) -> source_indexer._Tokens:
+        scans.append(("tokens", txt))
+        return real_tokens(txt)
+
+    def counting_hooks(self: SourceIndexer, txt: str) -> list[tuple[int, tuple[str, str]]]:
+        scans.append(("hooks", txt))
+        return real_hooks(self, txt)
+
+    monkeypatch.setattr(source_indexer, "_scan_tokens", counting_tokens)
+    monkeypatch.setattr(SourceIndexer, "_scan_hooks", counting_hooks)
+    return scans
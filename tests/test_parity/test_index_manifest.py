@@ -0,0 +1,31 @@
+"""Tests for the persistent source index manifest."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from re_agent.parity.index_manifest import IndexManifest
+
+
+def test_store_and_load_round_trip(tmp_path: Path) -> None:
+    manifest = IndexManifest(tmp_path / "nested" / "index.db")
+    manifest.store("tokens", [("a.cpp", (1, 2), [["C", "F", 3]])])
+    manifest.store("hooks", [("a.cpp", (1, 2), [[16, "C", "F"]])], signature="sig")
+    manifest.store("tokens", [("a.cpp", (5, 6), [])])
+
+    reopened = IndexManifest(tmp_path / "nested" / "index.db")
+    assert reopened.load("tokens") == {"a.cpp": ((5, 6), [])}
+    assert reopened.load("hooks", "sig") == {"a.cpp": ((1, 2), [[16, "C", "F"]])}
+    assert reopened.load("hooks", "other") == {}
+
+    reopened.clear()
+    assert reopened.load("tokens") == {}
+
+
+def test_unusable_database_is_ignored(tmp_path: Path) -> None:
+    db = tmp_path / "index.db"
+    db.write_bytes(b"this is not a sqlite database" * 10)
+    manifest = IndexManifest(db)
+    assert manifest.load("tokens") == {}
+    assert not manifest.available
+    manifest.store("tokens", [("a.cpp", (1, 2), [])])
+    manifest.clear()
@@ -1,57 +1,60 @@
 """Tests for source indexer."""
 from __future__ import annotations
 
+import dataclasses
+import functools
+import os
+from collections.abc import Callable
 from pathlib import Path
+from typing import Any, Final
+
+import pytest
 
 from re_agent.config.schema import ProjectProfile
+from re_agent.parity import source_indexer
 from re_agent.parity.source_indexer import SourceIndexer
 
+SourceWriter = Callable[[str, str], SourceIndexer]
 
-def test_find_function_body(tmp_path: Path) -> None:
-    src = tmp_path / "test.cpp"
-    src.write_text('''
+
+def test_find_function_body(write_source: SourceWriter) -> None:
+    indexer = write_source("test.cpp", '''
 void CTrain::ProcessControl() {
     if (m_nStatus == 5) {
         DoStuff();
     }
 }
 ''')
-    indexer = SourceIndexer(tmp_path)
     match = indexer.find("CTrain", "ProcessControl")
     assert match is not None
     assert match.body_lines > 1
     assert match.call_count >= 1
+    assert "DoStuff" in match.callee_names
 
 
-def test_find_returns_none_for_missing(tmp_path: Path) -> None:
-    src = tmp_path / "test.cpp"
-    src.write_text("void Foo() { }")
-    indexer = SourceIndexer(tmp_path)
+def test_find_returns_none_for_missing(write_source: SourceWriter) -> None:
+    indexer = write_source("test.cpp", "void Foo() { }")
     match = indexer.find("CTrain", "DoesNotExist")
     assert match is None
 
 
-def test_stub_marker_detection(tmp_path: Path) -> None:
-    src = tmp_path / "test.cpp"
-    src.write_text('''
+def test_stub_marker_detection(write_source: SourceWriter) -> None:
+    indexer = write_source("test.cpp", '''
 void CTrain::Shutdown() {
     NOTSA_UNREACHABLE();
 }
 ''')
-    indexer = SourceIndexer(tmp_path)
     match = indexer.find("CTrain", "Shutdown")
     assert match is not None
     assert match.has_stub_marker
 
 
-def test_inline_forwarder_detection(tmp_path: Path) -> None:
-    src = tmp_path / "test.cpp"
-    src.write_text('''
+def test_inline_forwarder_detection(write_source: SourceWriter) -> None:
+    indexer = write_source("test.cpp", '''
 void CTrain::UpdateSpeed() {
     return I_UpdateSpeed<false>();
 }
 ''')
-    indexer = SourceIndexer(tmp_path)
     match = indexer.find("CTrain", "UpdateSpeed")
     assert match is not None
     assert match.is_inline_internal_forwarder
@@ -60,39 +63,53 @@ void CTrain::UpdateSpeed() {
 # -- Empty fn_name guard tests ------------------------------------------------
 
 
-def test_find_empty_fn_name_returns_none(tmp_path: Path) -> None:
+def test_find_empty_fn_name_returns_none(write_source: SourceWriter) -> None:
     """find('', '') must NOT match arbitrary functions."""
-    src = tmp_path / "test.cpp"
-    src.write_text("void Foo() { return; }\n")
-    indexer = SourceIndexer(tmp_path)
+    indexer = write_source("test.cpp", "void Foo() { return; }\n")
     assert indexer.find("", "") is None
 
 
-def test_find_empty_fn_name_with_class_returns_none(tmp_path: Path) -> None:
-    src = tmp_path / "test.cpp"
-    src.write_text("void CTrain::Go() { }\n")
-    indexer = SourceIndexer(tmp_path)
+def test_find_empty_fn_name_with_class_returns_none(write_source: SourceWriter) -> None:
+    indexer = write_source("test.cpp", "void CTrain::Go() { }\n")
     assert indexer.find("CTrain", "") is None
+    assert ("CTrain", "") not in indexer.lookup_cache
 
 
 # -- find_by_address with hook_patterns ----------------------------------------
 
 
-def _make_profile(**overrides: object) -> ProjectProfile:
-    defaults: dict[str, object] = {
-        "hook_patterns": [
-            r"RH_ScopedInstall\s*\(\s*(\w+)\s*,\s*(0x[0-9A-Fa-f]+)",
-        ],
-        "class_macro": "RH_ScopedClass",
-        "source_root": ".",
-        "source_extensions": [".cpp"],
-        "hooks_csv": None,
-        "stub_markers": ["NOTSA_UNREACHABLE"],
-        "stub_call_prefix": "plugin::Call",
-        "stub_patterns": [],
+_BASE_PROFILE: Final[ProjectProfile] = ProjectProfile(
+    hook_patterns=[
+        r"RH_ScopedInstall\s*\(\s*(\w+)\s*,\s*(0x[0-9A-Fa-f]+)",
+    ],
+    class_macro="RH_ScopedClass",
+    source_root=".",
+    source_extensions=[".cpp"],
+    hooks_csv=None,
+    stub_markers=["NOTSA_UNREACHABLE"],
+    stub_call_prefix="plugin::Call",
+    stub_patterns=[],
+)
+
+
+@functools.cache
+def _cached_profile(overrides: tuple[tuple[str, Any], ...]) -> ProjectProfile:
+    # dataclasses.replace is shallow, so copy the base's list fields as well;
+    # otherwise every profile would share (and could corrupt) _BASE_PROFILE's lists.
+    fields = {
+        f.name: list(value) for f in dataclasses.fields(_BASE_PROFILE)
+        if isinstance(value := getattr(_BASE_PROFILE, f.name), list)
     }
-    defaults.update(overrides)
-    return ProjectProfile(**defaults)  # type: ignore[arg-type]
+    fields.update((k, list(v) if isinstance(v, tuple) else v) for k, v in overrides)
+    return dataclasses.replace(_BASE_PROFILE, **fields)
+
+
+def _make_profile(**overrides: Any) -> ProjectProfile:
+    # Lists are frozen into tuples for the cache key and restored on build.
+    # Equal overrides share one profile, and with it the compiled patterns.
+    # Cached profiles are shared across tests and must never be mutated.
+    key = tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in overrides.items()))
+    return _cached_profile(key)
 
 
 def test_find_by_address_resolves_via_hook_pattern(tmp_path: Path) -> None:
@@ -123,6 +140,11 @@ void CTrain::Shutdown() {
     assert match2 is not None
     assert "NOTSA_UNREACHABLE" in match2.body
 
+    # Normalized, prefixed and integer forms resolve to the same entry
+    for form in ("006F5900", "gta_sa.exe:0x6F5900", 0x6F5900):
+        same = indexer.find_by_address(form)
+        assert same is not None and same.body == match2.body
+
 
 def test_find_by_address_unknown_returns_none(tmp_path: Path) -> None:
     src = tmp_path / "test.cpp"
@@ -130,6 +152,9 @@ def test_find_by_address_unknown_returns_none(tmp_path: Path) -> None:
     profile = _make_profile(source_root=str(tmp_path))
     indexer = SourceIndexer(tmp_path, profile)
     assert indexer.find_by_address("0xDEADBEEF") is None
+    assert indexer.find_by_address("not-an-address") is None
+    assert indexer.find_by_address("") is None
+    assert indexer.find_by_address("  ") is None
 
 
 def test_find_all_exposes_overloaded_definitions(tmp_path: Path) -> None:
@@ -154,6 +179,232 @@ void CTrain::ProcessControl() {
 ''')
     profile = _make_profile(source_root=str(tmp_path))
     indexer = SourceIndexer(tmp_path, profile)
-    entry = indexer.hook_address_index.get("0x6f86a0")
+    entry = indexer.hook_address_index.get(0x6F86A0)
     assert entry is not None
     assert entry == ("CTrain", "ProcessControl")
+
+
+def test_source_files_walks_nested_dirs_once_per_file(tmp_path: Path) -> None:
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "Deep.cpp").write_text("void CDeep::Go() { }\n")
+    (tmp_path / "a" / "Shallow.h").write_text("")
+    (tmp_path / "notes.txt").write_text("")
+    profile = _make_profile(source_extensions=[".cpp", ".h", ".cpp"])
+    indexer = SourceIndexer(tmp_path, profile)
+    assert indexer.source_files == [
+        tmp_path / "a" / "Shallow.h",
+        tmp_path / "a" / "b" / "Deep.cpp",
+    ]
+    assert indexer.find("CDeep", "Go") is not None
+
+
+def test_inline_forwarder_rejects_unbalanced_call_order() -> None:
+    assert SourceIndexer._is_inline_internal_forwarder("{ return I_Foo(a(b), c); }")
+    assert not SourceIndexer._is_inline_internal_forwarder("{ return I_Foo()) + (g(); }")
+    assert not SourceIndexer._is_inline_internal_forwarder("{ return I_Foo((); }")
+
+
+def test_free_call_names_prefilter_keeps_free_functions(tmp_path: Path) -> None:
+    (tmp_path / "util.cpp").write_text("static int Helper(int x) {\n    return Other(x);\n}\n")
+    indexer = SourceIndexer(tmp_path)
+    assert indexer.find("CUnknown", "Missing") is None
+    assert "Missing" not in indexer.free_call_names
+    match = indexer.find("CUnknown", "Helper")
+    assert match is not None
+    assert "Other" in match.body
+
+
+def test_matching_brace_skips_comments_and_literals() -> None:
+    text = '{ a("}"); b(\'}\'); /* } */ // }\n c("\\"}"); }'
+    assert SourceIndexer._find_matching_brace(text, 0) == len(text) - 1
+    assert SourceIndexer._find_matching_brace("{ /* unterminated }", 0) is None
+    assert SourceIndexer._find_matching_paren("(a, (b), \")\")", 0) == 12
+
+
+def test_reindex_file_refreshes_changed_and_removed_files(tmp_path: Path) -> None:
+    src = tmp_path / "CTrain.cpp"
+    src.write_text("RH_ScopedClass(CTrain);\nRH_ScopedInstall(Go, 0x10);\nvoid CTrain::Go() { Old(); }\n")
+    indexer = SourceIndexer(tmp_path, _make_profile())
+    match = indexer.find_by_address("0x10")
+    assert match is not None and "Old" in match.body
+
+    src.write_text("RH_ScopedClass(CTrain);\nRH_ScopedInstall(Go, 0x20);\nvoid CTrain::Go() { New(); }\n")
+    indexer.reindex_file(src)
+    assert indexer.find_by_address("0x10") is None
+    match = indexer.find("CTrain", "Go")
+    assert match is not None and "New" in match.body
+
+    added = tmp_path / "CBike.cpp"
+    added.write_text("void CBike::Ride() { }\n")
+    indexer.reindex_file(added)
+    assert indexer.find("CBike", "Ride") is not None
+
+    src.unlink()
+    indexer.reindex_file(src)
+    assert src not in indexer.source_files
+    assert indexer.find("CTrain", "Go") is None
+    assert indexer.find_by_address("0x20") is None
+    assert ("CTrain", "Go") not in indexer.token_index
+    assert [p for p, _ in indexer.token_index[("CBike", "Ride")]] == [added]
+
+
+def test_reindex_file_keeps_first_file_definition_order(tmp_path: Path) -> None:
+    first, second = tmp_path / "A.cpp", tmp_path / "B.cpp"
+    first.write_text("void CX::F() { OldA(); }\n")
+    second.write_text("void CX::F() { FromB(); }\n")
+    indexer = SourceIndexer(tmp_path, _make_profile())
+
+    first.write_text("void CX::F() { NewA(); }\n")
+    indexer.reindex_file(first)
+    match = indexer.find("CX", "F")
+    assert match is not None and "NewA" in match.body
+    assert indexer.token_index == SourceIndexer(tmp_path, _make_profile()).token_index
+
+
+def test_reindex_file_restores_hooks_shared_with_other_files(tmp_path: Path) -> None:
+    first, second = tmp_path / "A.cpp", tmp_path / "B.cpp"
+    first.write_text("RH_ScopedClass(CA);\nRH_ScopedInstall(Go, 0x10);\n")
+    second.write_text("RH_ScopedClass(CB);\nRH_ScopedInstall(Go, 0x10);\n")
+    indexer = SourceIndexer(tmp_path, _make_profile())
+    assert indexer.hook_address_index == {0x10: ("CB", "Go")}
+
+    second.unlink()
+    indexer.reindex_file(second)
+    assert indexer.hook_address_index == {0x10: ("CA", "Go")}
+
+    second.write_text("RH_ScopedClass(CB);\nRH_ScopedInstall(Go, 0x10);\n")
+    indexer.reindex_file(second)
+    first.write_text("RH_ScopedClass(CA);\nRH_ScopedInstall(Go, 0x10);\nRH_ScopedInstall(Run, 0x20);\n")
+    indexer.reindex_file(first)
+    assert indexer.hook_address_index == SourceIndexer(tmp_path, _make_profile()).hook_address_index
+    assert indexer.hook_address_index == {0x10: ("CB", "Go"), 0x20: ("CA", "Run")}
+
+
+def test_hook_scan_single_pass_matches_separate_scans(tmp_path: Path) -> None:
+    (tmp_path / "CTrain.cpp").write_text(
+        "RH_ScopedInstall(Early, 0x10);\n"
+        "RH_ScopedClass(CTrain);\n"
+        "RH_ScopedVirtualInstall(Virt, 0x20);\n"
+        "RH_ScopedClass(COther);\n"
+    )
+    patterns = [
+        r"RH_ScopedInstall\s*\(\s*(\w+)\s*,\s*(0x[0-9A-Fa-f]+)",
+        r"RH_ScopedVirtualInstall\s*\(\s*(\w+)\s*,\s*(0x[0-9A-Fa-f]+)",
+    ]
+    combined = SourceIndexer(tmp_path, _make_profile(hook_patterns=patterns))
+    # A numbered backreference cannot be nested, so this profile falls back
+    # to one scan per pattern.
+    fallback = SourceIndexer(tmp_path, _make_profile(hook_patterns=[*patterns, r"(\w)\1(\w+)(0x0)"]))
+    assert combined._hook_scan is not None
+    assert fallback._hook_scan is None
+    expected = {0x10: ("CTrain", "Early"), 0x20: ("CTrain", "Virt")}
+    assert combined.hook_address_index == expected
+    assert fallback.hook_address_index == expected
+
+
+def test_parse_cache_reused_until_file_changes(tmp_path: Path, scan_counter: list[tuple[str, str]]) -> None:
+    src = tmp_path / "CTrain.cpp"
+    src.write_text("RH_ScopedClass(CTrain);\nRH_ScopedInstall(Go, 0x10);\nvoid CTrain::Go() { }\n")
+    profile = _make_profile()
+    assert SourceIndexer(tmp_path, profile).hook_address_index
+
+    scan_counter.clear()
+    warm = SourceIndexer(tmp_path, profile)
+    assert warm.hook_address_index == {0x10: ("CTrain", "Go")}
+    assert warm.find("CTrain", "Go") is not None
+    assert scan_counter == []
+
+    src.write_text("void CTrain::Go() { Longer(); }\n")
+    os.utime(src, ns=(1, 1))
+    assert SourceIndexer(tmp_path, profile).hook_address_index == {}
+    assert [kind for kind, _ in scan_counter] == ["tokens", "hooks"]
+
+
+def test_hook_index_built_only_on_first_address_lookup(
+    tmp_path: Path, scan_counter: list[tuple[str, str]],
+) -> None:
+    (tmp_path / "CTrain.cpp").write_text(
+        "RH_ScopedClass(CTrain);\nRH_ScopedInstall(Go, 0x30);\nvoid CTrain::Go() { }\n"
+    )
+    indexer = SourceIndexer(tmp_path, _make_profile())
+    assert indexer.find("CTrain", "Go") is not None
+    assert [kind for kind, _ in scan_counter] == ["tokens"]
+    assert indexer.find_by_address("0x30") is not None
+    assert indexer.find_by_address("0x31") is None
+    assert [kind for kind, _ in scan_counter] == ["tokens", "hooks"]
+
+
+def test_parallel_read_builds_same_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    for i in range(6):
+        (tmp_path / f"C{i}.cpp").write_text(f"void C{i}::Go() {{ Step{i}(); }}\nvoid CShared::Dup() {{ V{i}(); }}\n")
+    serial = SourceIndexer(tmp_path)
+    monkeypatch.setattr(source_indexer, "_PARALLEL_READ_MIN_FILES", 1)
+    monkeypatch.setattr(source_indexer.os, "cpu_count", lambda: 4)
+    parallel = SourceIndexer(tmp_path)
+    assert dict(parallel.token_index) == dict(serial.token_index)
+    assert parallel.file_text_cache == serial.file_text_cache
+    match = parallel.find("CShared", "Dup")
+    assert match is not None and "V0" in match.body
+
+
+def test_index_db_skips_unchanged_files_across_processes(
+    tmp_path: Path, scan_counter: list[tuple[str, str]],
+) -> None:
+    root = tmp_path / "src"
+    root.mkdir()
+    (root / "CTrain.cpp").write_text("RH_ScopedClass(CTrain);\nRH_ScopedInstall(Go, 0x10);\nvoid CTrain::Go() { }\n")
+    (root / "CBike.cpp").write_text("void CBike::Ride() { }\n")
+    db = tmp_path / "index.db"
+    profile = _make_profile()
+    first = SourceIndexer(root, profile, index_db=db)
+    assert first.hook_address_index
+    first.flush()
+
+    # A fresh process starts with empty in-memory caches.
+    source_indexer.clear_parse_cache()
+    scan_counter.clear()
+    (root / "CBike.cpp").write_text("void CBike::Ride() { Pedal(); }\n")
+    warm = SourceIndexer(root, profile, index_db=db)
+    assert scan_counter == [("tokens", "void CBike::Ride() { Pedal(); }\n")]
+    assert warm.find_by_address(0x10) is not None
+    ride = warm.find("CBike", "Ride")
+    assert ride is not None and "Pedal" in ride.body
+
+
+def test_file_loader_indexes_virtual_sources() -> None:
+    root = Path("/no-such-root")
+    files = {
+        root / "CTrain.cpp": "RH_ScopedClass(CTrain);\nRH_ScopedInstall(Go, 0x40);\nvoid CTrain::Go() { Run(); }\n",
+    }
+    indexer = SourceIndexer(root, _make_profile(), file_loader=files.__getitem__, source_files=files)
+    assert indexer.source_files == [root / "CTrain.cpp"]
+    match = indexer.find_by_address(0x40)
+    assert match is not None and match.path == str(root / "CTrain.cpp")
+    assert "Run" in match.callee_names
+
+
+def test_corrupt_index_db_does_not_break_indexing(tmp_path: Path) -> None:
+    root = tmp_path / "src"
+    root.mkdir()
+    (root / "CTrain.cpp").write_text("RH_ScopedClass(CTrain);\nRH_ScopedInstall(Go, 0x10);\nvoid CTrain::Go() { }\n")
+    db = tmp_path / "index.db"
+    db.write_bytes(b"garbage" * 100)
+    indexer = SourceIndexer(root, _make_profile(), index_db=db)
+    assert indexer.find_by_address(0x10) is not None
+    indexer.flush()
+
+
+def test_index_db_ignores_rows_from_another_format(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, scan_counter: list[tuple[str, str]],
+) -> None:
+    root = tmp_path / "src"
+    root.mkdir()
+    (root / "CBike.cpp").write_text("void CBike::Ride() { }\n")
+    db = tmp_path / "index.db"
+    SourceIndexer(root, _make_profile(), index_db=db).flush()
+
+    source_indexer.clear_parse_cache()
+    monkeypatch.setattr(source_indexer, "_MANIFEST_FORMAT", source_indexer._MANIFEST_FORMAT + 1)
+    scan_counter.clear()
+    SourceIndexer(root, _make_profile(), index_db=db)
+    assert scan_counter == [("tokens", "void CBike::Ride() { }\n")]
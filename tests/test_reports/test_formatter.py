@@ -0,0 +1,61 @@
+"""Tests for report formatters."""
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from re_agent.core.models import FunctionTarget, ParityStatus, ReversalResult
+from re_agent.reports import formatter
+from re_agent.reports.formatter import (
+    results_to_json,
+    results_to_json_and_markdown,
+    results_to_markdown,
+)
+
+
+def _results() -> list[ReversalResult]:
+    return [
+        ReversalResult(
+            target=FunctionTarget(address="0x6F86A0", class_name="CTrain", function_name="ProcessControl"),
+            code="void CTrain::ProcessControl() {}",
+            parity_status=ParityStatus.GREEN,
+            rounds_used=2,
+            success=True,
+        ),
+        ReversalResult(
+            target=FunctionTarget(address="0x6F5900", class_name="CTrain", function_name="Shutdown"),
+            code="",
+            rounds_used=4,
+        ),
+    ]
+
+
+def test_results_to_json_round_trips() -> None:
+    data = json.loads(results_to_json(_results()))
+    assert [r["function_name"] for r in data["results"]] == ["ProcessControl", "Shutdown"]
+    assert data["results"][0]["parity_status"] == "green"
+    assert data["results"][1]["code"] is None
+
+
+def test_results_to_markdown_rows() -> None:
+    lines = results_to_markdown(_results()).splitlines()
+    assert lines[2] == "| 0x6F86A0 | CTrain::ProcessControl | PASS | 2 | green |"
+    assert lines[3] == "| 0x6F5900 | CTrain::Shutdown | FAIL | 4 | - |"
+
+
+def test_results_to_json_and_markdown_matches_individual_renderers() -> None:
+    results = _results()
+    as_json, as_md = results_to_json_and_markdown(results)
+    assert as_json == results_to_json(results)
+    assert as_md == results_to_markdown(results)
+
+
+def test_results_to_json_is_identical_with_and_without_orjson(monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("orjson")
+    results = _results()
+    results[0].code = "// Z\u00fcrich\nvoid CTrain::ProcessControl() {}"
+    with_orjson = results_to_json(results)
+    monkeypatch.setattr(formatter, "_HAS_ORJSON", False)
+    assert results_to_json(results) == with_orjson
+    assert "// Z\u00fcrich" in with_orjson
@@ -0,0 +1,45 @@
+"""Tests for subprocess helpers."""
+from __future__ import annotations
+
+import asyncio
+import sys
+
+from re_agent.utils.process import run_cmd, run_cmd_async, run_cmd_batch
+
+
+def test_run_cmd_async_captures_output() -> None:
+    ok, output = asyncio.run(run_cmd_async([sys.executable, "-c", "print('hi')"]))
+    assert ok
+    assert output.strip() == "hi"
+
+
+def test_run_cmd_async_translates_newlines_like_run_cmd() -> None:
+    args = [sys.executable, "-c", r"import sys; sys.stdout.buffer.write(b'a\r\nb\rc\n')"]
+    assert asyncio.run(run_cmd_async(args)) == (True, "a\nb\nc\n")
+    assert run_cmd(args) == (True, "a\nb\nc\n")
+
+
+def test_run_cmd_async_missing_executable() -> None:
+    ok, output = asyncio.run(run_cmd_async(["definitely-not-a-real-command-xyz"]))
+    assert not ok
+    assert "Command not found" in output
+
+
+def test_run_cmd_async_timeout() -> None:
+    args = [sys.executable, "-c", "import time; time.sleep(5)"]
+    ok, output = asyncio.run(run_cmd_async(args, timeout_s=1))
+    assert not ok
+    assert output.startswith("TIMEOUT")
+    assert (ok, output) == run_cmd(args, timeout_s=1)
+
+
+def test_run_cmd_batch_preserves_order() -> None:
+    cmds = [[sys.executable, "-c", f"print({i})"] for i in range(5)]
+    results = run_cmd_batch(cmds, concurrency=2)
+    assert [out.strip() for _ok, out in results] == ["0", "1", "2", "3", "4"]
+    assert all(ok for ok, _out in results)
+
+
+def test_run_cmd_batch_reports_failures() -> None:
+    results = run_cmd_batch([[sys.executable, "-c", "raise SystemExit(3)"]])
+    assert results == [(False, "")]
@@ -0,0 +1,23 @@
+"""Tests for template rendering helpers."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from re_agent.utils.templates import render_template
+
+
+def test_render_template_substitutes_and_keeps_unknown(tmp_path: Path) -> None:
+    tmpl = tmp_path / "t.md"
+    tmpl.write_text("Hello $name, $missing", encoding="utf-8")
+    assert render_template(tmpl, name="world") == "Hello world, $missing"
+
+
+def test_render_template_reloads_modified_file(tmp_path: Path) -> None:
+    tmpl = tmp_path / "t.md"
+    tmpl.write_text("v1 $x", encoding="utf-8")
+    assert render_template(tmpl, x="a") == "v1 a"
+    tmpl.write_text("v2 $x", encoding="utf-8")
+    st = tmpl.stat()
+    os.utime(tmpl, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert render_template(tmpl, x="b") == "v2 b"
@@ -0,0 +1,122 @@
+"""Tests for C++/assembly text analysis helpers."""
+from __future__ import annotations
+
+from re_agent.utils.text import (
+    FP_SOURCE_TOKENS,
+    compile_markers,
+    count_calls,
+    count_calls_and_control_flow,
+    count_control_flow,
+    has_fp_asm,
+    has_fp_token,
+    has_marker,
+    make_call_counter,
+    scan_body,
+    strip_comments,
+)
+
+
+def test_has_fp_token_detects_each_token() -> None:
+    for tok in FP_SOURCE_TOKENS:
+        assert has_fp_token(f"x = {tok}y);")
+
+
+def test_has_fp_token_negative() -> None:
+    assert not has_fp_token("int x = Compute(a, b);\nreturn x;")
+    assert not has_fp_token("")
+
+
+def test_has_fp_asm_detects_fp_opcodes() -> None:
+    asm = "00401000  PUSH EBP\n00401001  FLD dword ptr [ESP]\n00401005  FMUL ST0, ST1\n"
+    assert has_fp_asm(asm)
+
+
+def test_has_fp_asm_ignores_non_fp_and_malformed_lines() -> None:
+    asm = "00401000  PUSH EBP\n00401001  FLD dword ptr [ESP]\nnot asm FADD\n  FSQRT\n"
+    assert not has_fp_asm(asm)
+
+
+def test_strip_comments_removes_both_forms() -> None:
+    src = "a(); // tail\n/* block\n spans */b();\nc(); /* x */ d();"
+    assert strip_comments(src) == "a(); \nb();\nc();  d();"
+
+
+def test_strip_comments_line_comment_hides_block_opener() -> None:
+    src = "// old /* note\nKeep();\n// */\n"
+    assert "Keep();" in strip_comments(src)
+
+
+def test_count_calls_and_control_flow_matches_separate_counters() -> None:
+    body = "{ if (x) { plugin::CallMethod<0x1>(this); } for (;;) Foo(); do { Bar(); } while (y); default:if (z) {} }"
+    total, plugin, non_plugin, flow = count_calls_and_control_flow(body)
+    assert (total, plugin, non_plugin) == count_calls(body)
+    assert flow == count_control_flow(body) == 5
+
+
+def test_has_fp_asm_does_not_join_lines() -> None:
+    assert not has_fp_asm("00401000\nFADD ST0, ST1\n")
+    assert has_fp_asm("00401000  PUSH EBP\r\n00401001\tFSQRT\r\n")
+
+
+def test_count_calls_stub_prefix() -> None:
+    body = "plugin::CallMethod(this); pFoo(); Bar();"
+    assert count_calls(body) == (3, 1, 2)
+    assert count_calls(body, stub_call_prefix="") == (3, 3, 0)
+
+
+def test_counters_accept_bytes() -> None:
+    body = "{ if (x) plugin::CallMethod(this); for (;;) Foo(); a::operator(); }"
+    assert count_calls_and_control_flow(body.encode()) == count_calls_and_control_flow(body)
+    assert count_calls(body.encode(), b"plugin::Call") == count_calls(body)
+    assert count_control_flow(body.encode()) == count_control_flow(body) == 2
+
+
+def test_strip_comments_is_memoized() -> None:
+    strip_comments.cache_clear()
+    src = "Foo(); // once\n"
+    assert strip_comments(src) == strip_comments(src) == "Foo(); \n"
+    assert strip_comments.cache_info().hits == 1
+
+
+def test_scan_body_combines_signals() -> None:
+    body = "{ if (x) { plugin::CallMethod(this); } float f = std::sqrt(y); NOTSA_UNREACHABLE(); }"
+    scan = scan_body(body, "plugin::Call", ("NOTSA_UNREACHABLE",))
+    assert (scan.call_count, scan.plugin_call_count, scan.non_plugin_call_count) == count_calls(body)
+    assert scan.control_flow_count == 1
+    assert scan.has_fp_token
+    assert scan.has_stub_marker
+    assert not scan_body(body).has_stub_marker
+    assert scan.callee_names == {"plugin::CallMethod", "std::sqrt", "NOTSA_UNREACHABLE"}
+
+
+def test_callee_names_match_counted_calls() -> None:
+    body = "if (a) Foo(); Foo(); while (b) X::operator(); operator(); return Bar<int> (1) + std::if(2);"
+    total, _, _, _, names = make_call_counter("plugin::Call")(body)
+    assert names == {"Foo", "std::if"}
+    assert total == count_calls(body)[0] == 3
+    assert make_call_counter(b"plugin::Call")(body.encode())[4] == {b"Foo", b"std::if"}
+
+
+def test_make_call_counter_is_cached_and_specialised() -> None:
+    counter = make_call_counter("plugin::Call")
+    assert make_call_counter("plugin::Call") is counter
+    body = "if (x) plugin::CallMethod(this); Foo();"
+    assert counter(body)[:4] == count_calls_and_control_flow(body)
+    assert make_call_counter("Foo")(body)[1] == 1
+
+
+def test_has_marker_uses_one_shared_alternation() -> None:
+    markers = ("NOTSA_UNREACHABLE", "TODO(x)")
+    assert compile_markers(markers) is compile_markers(markers)
+    assert compile_markers(("",)) is None
+    assert has_marker("{ TODO(x); }", markers)
+    assert not has_marker("{ TODO(y); }", markers)
+    assert not has_marker("{ NOTSA_UNREACHABLE(); }", ())
+    assert has_marker("{ NOTSA_UNREACHABLE(); }", ("NOTSA_UNREACHABLE",))
+    assert not has_marker("{ }", ("",))
+
+
+def test_scan_body_does_not_fill_the_counter_cache() -> None:
+    before = count_calls_and_control_flow.cache_info().currsize
+    scan_body("{ UniqueScanBodyCall(); }")
+    assert count_calls_and_control_flow.cache_info().currsize == before